@@ -0,0 +1,22 @@
+import hashlib
+from functools import lru_cache
+from importlib import resources
+
+from prioritizer.models import Action, construct_actions_json
+
+
+@lru_cache(maxsize=1)
+def load_catalog_bytes() -> bytes:
+    return resources.files("prioritizer.data").joinpath("actions.json").read_bytes()
+
+
+@lru_cache(maxsize=1)
+def catalog_hash() -> str:
+    # identifies the exact catalog a model and its cached feature matrix were built against
+    return hashlib.sha256(load_catalog_bytes()).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def load_actions() -> list[Action]:
+    # the packaged catalog is generated from validated models by scripts/action_loader.py
+    return construct_actions_json(load_catalog_bytes())
@@ -0,0 +1,31 @@
+# Lazily constructed API and database clients. The heavy SDKs (openai, chromadb) are only
+# imported the first time a client is requested, so importing the package stays cheap.
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from prioritizer.settings import get_settings
+
+if TYPE_CHECKING:
+    from chromadb.api import ClientAPI
+    from openai import AsyncOpenAI, OpenAI
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> "OpenAI":
+    from openai import OpenAI
+
+    return OpenAI(api_key=get_settings().openai_api_key)
+
+
+@lru_cache(maxsize=1)
+def get_async_openai_client() -> "AsyncOpenAI":
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=get_settings().openai_api_key)
+
+
+@lru_cache(maxsize=1)
+def get_chroma_client() -> "ClientAPI":
+    import chromadb
+
+    return chromadb.PersistentClient(path=get_settings().chroma_db_path)
@@ -0,0 +1,71 @@
+# Request coalescing and admission control for endpoints that call out to the embedding, vector
+# store and LLM APIs.
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+
+
+class Overloaded(Exception):
+    """Raised when work is shed instead of queued. retry_after is a hint in seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Overloaded, retry after {retry_after:g}s")
+        self.retry_after = retry_after
+
+
+class SingleFlight[T]:
+    """Concurrent calls with the same key share one in-flight computation and its result or error."""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task[T]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # a disconnecting caller must not cancel the computation the other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task[T]):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+
+class AdmissionController:
+    """Bounds concurrent upstream work and the queue in front of it.
+
+    At most max_concurrency callers run at once and at most max_queue wait. Callers beyond that, or
+    callers that wait longer than max_wait seconds, get Overloaded right away instead of queueing,
+    which keeps tail latency bounded under bursts.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_wait: float, retry_after: float = 1.0):
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @asynccontextmanager
+    async def admit(self):
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            raise Overloaded(self.retry_after)
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+        except TimeoutError:
+            raise Overloaded(self.retry_after) from None
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            self._semaphore.release()
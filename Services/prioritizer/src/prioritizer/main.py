@@ -1,37 +1,146 @@
-import json
-from importlib import resources
+import logging
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 
+from prioritizer.catalog import catalog_hash, load_actions
+from prioritizer.concurrency import AdmissionController, Overloaded, SingleFlight
+from prioritizer.ml.registry import registry
+from prioritizer.ml.ranker import profile_key
+from prioritizer.ml.selection import InvalidCursor, decode_cursor, encode_cursor, filter_mask, query_fingerprint, select_page
+from prioritizer.models import Action, UserProfile
+from prioritizer.prompts.explain_action import generate_action_explanation
+from prioritizer.rag import retriever
+from prioritizer.settings import get_settings
 
-class UserProfile(BaseModel):
-    city: str
-    lifestyle: str
-    transportation: str
-    diet: str
-    energy: str
+logger = logging.getLogger(__name__)
 
+# Upstream (embedding, vector store, LLM) bound work: at most UPSTREAM_MAX_CONCURRENCY calls in
+# flight, at most UPSTREAM_MAX_QUEUE waiting for UPSTREAM_MAX_WAIT seconds, the rest get a 503
+UPSTREAM_MAX_CONCURRENCY = 8
+UPSTREAM_MAX_QUEUE = 32
+UPSTREAM_MAX_WAIT = 5.0
+UPSTREAM_RETRY_AFTER = 2.0
+
+upstream_admission = AdmissionController(
+    max_concurrency=UPSTREAM_MAX_CONCURRENCY,
+    max_queue=UPSTREAM_MAX_QUEUE,
+    max_wait=UPSTREAM_MAX_WAIT,
+    retry_after=UPSTREAM_RETRY_AFTER,
+)
+explain_flight: SingleFlight[str] = SingleFlight()
+
+
+def warmup():
+    # pay the one-off costs (catalog parse, model load, SDK imports, client construction) before serving traffic
+    registry.load(load_actions(), catalog_hash())
+    if registry.active is None:
+        logger.warning("No published ranker version found, /actions/rank is unavailable until one is trained")
+    try:
+        get_settings()
+    except ValidationError:
+        logger.warning("OpenAI settings are not configured, skipping retriever warmup")
+        return
+    try:
+        retriever.warmup()
+    except Exception:
+        logger.warning("Retriever warmup failed, it will be retried on first use", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup()
+    registry.start()
+    yield
+    registry.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service is overloaded, try again later"},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
 
-app = FastAPI()
 
 @app.get("/health")
 def read_root():
-    return {"status": "healthy"}
+    model = registry.active
+    return {"status": "healthy", "model_version": model.version if model else None}
 
 
 @app.get("/actions")
 def get_actions():
-    data_file = resources.files("prioritizer.data").joinpath("actions.json")
-    actions = json.loads(data_file.read_text())
-    return {"actions": actions}
+    return {"actions": load_actions()}
+
+async def _explain(action: Action) -> str:
+    async with upstream_admission.admit():
+        return await generate_action_explanation(action)
+
 
 @app.post("/actions/{action_id}/explain")
-def explain_action(action_id: int):
-    return {"action_id": action_id, "explanation": "This is a placeholder explanation."}
+async def explain_action(action_id: int):
+    actions = load_actions()
+    if not 0 <= action_id < len(actions):
+        raise HTTPException(status_code=404, detail="Action not found")
+    # concurrent requests for the same action share one retrieval and LLM call, and only that
+    # shared call takes an admission slot
+    explanation = await explain_flight.do(action_id, lambda: _explain(actions[action_id]))
+    return {"action_id": action_id, "explanation": explanation}
 
 
 @app.post("/actions/rank")
-def rank_actions(user_profile: UserProfile):
-    return {"ranked_actions": []}
+def rank_actions(
+    user_profile: UserProfile,
+    k: int = Query(10, ge=1, le=100, description="number of actions per page"),
+    sector: str | None = Query(None),
+    mode: str | None = Query(None),
+    max_cost: float | None = Query(None, description="US$ per t CO2-eq; actions with unknown cost are excluded"),
+    diversify: bool = Query(False, description="spread results across sectors and clusters (MMR)"),
+    diversity: float = Query(0.3, ge=0.0, le=1.0, description="weight on novelty versus score when diversifying"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+):
+    # not coalesced or admission controlled: this runs concurrently in the threadpool, but it only
+    # reads the in-memory ranking table and makes no upstream calls, so there is nothing to share
+    # read the active model once so the whole request is served by a single version
+    model = registry.active
+    if model is None:
+        raise HTTPException(status_code=503, detail="No ranker model is available")
+    scores = model.score(user_profile)
+    candidates = np.flatnonzero(filter_mask(model.columns, sector=sector, mode=mode, max_cost=max_cost))
+    fingerprint = query_fingerprint(profile_key(user_profile), sector, mode, max_cost, diversify, diversity)
+
+    state = {}
+    if cursor is not None:
+        try:
+            state = decode_cursor(cursor, len(model.actions), diversify)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if state.get("query") != fingerprint:
+            raise HTTPException(status_code=400, detail="Cursor does not match this query")
+        if state.get("model_version") != model.version:
+            raise HTTPException(status_code=409, detail="The ranking model changed, restart from the first page")
+
+    page, next_state, exhausted = select_page(scores, candidates, model.columns, k, diversify, diversity, state)
+
+    next_cursor = None
+    if not exhausted:
+        next_cursor = encode_cursor({"model_version": model.version, "query": fingerprint, **next_state})
 
+    ranked_actions = [
+        {"action_id": int(i), "score": float(scores[i]), **model.actions[i].model_dump()}
+        for i in page
+    ]
+    return {
+        "model_version": model.version,
+        "total": len(candidates),
+        "ranked_actions": ranked_actions,
+        "next_cursor": next_cursor,
+    }
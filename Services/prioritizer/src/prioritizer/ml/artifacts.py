@@ -0,0 +1,86 @@
+# Versioned ranker artifacts. Each version is a directory holding the weights (weights.npz) and a
+# manifest describing the catalog and feature schema it was trained against:
+#
+#   model/
+#     current.json           {"version": "..."} - the version workers should serve
+#     <version>/weights.npz
+#     <version>/manifest.json
+#
+# Publishing writes the version directory first and then replaces current.json atomically, so a
+# reader never observes a half written model.
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from prioritizer.ml.ranker import Ranker
+
+MODEL_DIR = Path(__file__).resolve().parent / "model"
+POINTER_FILE = "current.json"
+WEIGHTS_FILE = "weights.npz"
+MANIFEST_FILE = "manifest.json"
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def _write_atomic(path: Path, payload: str):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def publish_ranker(ranker: Ranker, catalog_hash: str, model_dir: Path = MODEL_DIR, metrics: dict | None = None) -> str:
+    """Write ranker as a new version and point current.json at it. Returns the version."""
+    created_at = datetime.now(timezone.utc)
+    digest = hashlib.sha256(ranker.weights.tobytes() + ranker.scale.tobytes()).hexdigest()[:8]
+    version = f"{created_at:%Y%m%d%H%M%S}-{digest}"
+
+    model_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=model_dir, prefix=f".{version}."))
+    np.savez(staging / WEIGHTS_FILE, weights=ranker.weights, scale=ranker.scale)
+    manifest = {
+        "version": version,
+        "created_at": created_at.isoformat(),
+        "catalog_hash": catalog_hash,
+        "feature_schema": list(ranker.feature_schema),
+        "metrics": metrics or {},
+    }
+    (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    os.replace(staging, model_dir / version)
+
+    _write_atomic(model_dir / POINTER_FILE, json.dumps({"version": version}))
+    return version
+
+
+def current_version(model_dir: Path = MODEL_DIR) -> str | None:
+    pointer = model_dir / POINTER_FILE
+    if not pointer.exists():
+        return None
+    return json.loads(pointer.read_text())["version"]
+
+
+def load_ranker(version: str, model_dir: Path = MODEL_DIR) -> tuple[Ranker, dict]:
+    """Load a published version, returning the ranker and its manifest."""
+    version_dir = model_dir / version
+    try:
+        manifest = json.loads((version_dir / MANIFEST_FILE).read_text())
+        with np.load(version_dir / WEIGHTS_FILE) as weights:
+            ranker = Ranker(
+                weights=weights["weights"],
+                scale=weights["scale"],
+                feature_schema=tuple(manifest["feature_schema"]),
+            )
+    except (OSError, KeyError, ValueError) as e:
+        raise ArtifactError(f"Could not load ranker version {version}: {e}") from e
+    return ranker, manifest
@@ -0,0 +1,201 @@
+# Offline evaluation of the ranker against held out LLM judgments. Pairs are split into folds by
+# profile, so every test profile is unseen during training. Each fold trains a ranker and scores
+# its test profiles; the metrics are computed per profile with array operations and then averaged
+# per profile segment. Folds run in parallel in a process pool.
+#
+#   python -m prioritizer.ml.evaluate --folds 5 --k 10 --segment-by income_level --min-pairwise-accuracy 0.8
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from prioritizer.ml.ranker import action_feature_matrix, feature_matrix, pairwise_correct, train_ranker
+from prioritizer.ml.train import SCORES_PATH, PairIndex, load_pair_index
+
+METRICS = ("pairwise_accuracy", "kendall_tau", "ndcg")
+SEGMENT_FIELDS = ("climate_zone", "primary_transport", "diet", "housing_type", "energy_source", "income_level")
+
+
+def assign_folds(n_profiles: int, folds: int, seed: int = 42) -> np.ndarray:
+    """Fold id for every profile, balanced across folds."""
+    fold_of = np.empty(n_profiles, dtype=np.intp)
+    fold_of[np.random.default_rng(seed).permutation(n_profiles)] = np.arange(n_profiles) % folds
+    return fold_of
+
+
+def pairwise_accuracy(utilities: np.ndarray, profile: np.ndarray, action_a: np.ndarray, action_b: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Share of each profile's judged pairs the model orders the same way. utilities is (profiles, actions)."""
+    n_profiles = utilities.shape[0]
+    correct = pairwise_correct(utilities[profile, action_a], utilities[profile, action_b], labels)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.bincount(profile, weights=correct, minlength=n_profiles) / np.bincount(profile, minlength=n_profiles)
+
+
+def win_rate_relevance(n_profiles: int, n_actions: int, profile: np.ndarray, action_a: np.ndarray, action_b: np.ndarray, labels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Graded relevance of each action for a profile: its win rate in that profile's judgments.
+
+    Returns (relevance, seen), both (profiles, actions); relevance is nan where seen is False.
+    """
+    flat_a, flat_b = profile * n_actions + action_a, profile * n_actions + action_b
+    size = n_profiles * n_actions
+    wins = np.bincount(flat_a, weights=labels, minlength=size) + np.bincount(flat_b, weights=1 - labels, minlength=size)
+    appearances = np.bincount(flat_a, minlength=size) + np.bincount(flat_b, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        relevance = (wins / appearances).reshape(n_profiles, n_actions)
+    return relevance, (appearances > 0).reshape(n_profiles, n_actions)
+
+
+def kendall_tau(utilities: np.ndarray, relevance: np.ndarray, seen: np.ndarray) -> np.ndarray:
+    """Kendall's tau-b per row between the model order and the judged (relevance) order of the seen actions.
+
+    All arguments are (profiles, actions). Pairs tied in either order count as neither concordant
+    nor discordant and are corrected for as in tau-b.
+    """
+    n_actions = utilities.shape[1]
+    upper = np.triu(np.ones((n_actions, n_actions), dtype=bool), k=1)
+    pairs = seen[:, :, None] & seen[:, None, :] & upper  # (profiles, actions, actions)
+    model_order = np.sign(utilities[:, :, None] - utilities[:, None, :])
+    judged = np.where(seen, relevance, 0.0)
+    judged_order = np.sign(judged[:, :, None] - judged[:, None, :])
+
+    agreement = (model_order * judged_order * pairs).sum(axis=(1, 2))
+    model_untied = ((model_order != 0) & pairs).sum(axis=(1, 2))
+    judged_untied = ((judged_order != 0) & pairs).sum(axis=(1, 2))
+    denominator = np.sqrt(model_untied * judged_untied)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, agreement / denominator, np.nan)
+
+
+def ndcg_at_k(utilities: np.ndarray, relevance: np.ndarray, seen: np.ndarray, k: int) -> np.ndarray:
+    """NDCG@k per row. utilities, relevance and seen are (profiles, actions); unseen actions are ignored."""
+    k = min(k, utilities.shape[1])
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    gains = np.where(seen, relevance, 0.0)
+
+    predicted = np.argsort(-np.where(seen, utilities, -np.inf), axis=1, kind="stable")[:, :k]
+    dcg = (np.take_along_axis(gains, predicted, axis=1) * discounts).sum(axis=1)
+    idcg = (-np.sort(-gains, axis=1)[:, :k] * discounts).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(idcg > 0, dcg / idcg, np.nan)
+
+
+def evaluate_fold(
+    table: np.ndarray,
+    action_a: np.ndarray,
+    action_b: np.ndarray,
+    profile: np.ndarray,
+    labels: np.ndarray,
+    test_profiles: np.ndarray,
+    k: int,
+) -> dict[str, np.ndarray]:
+    """Train on every profile not in test_profiles and score the rest.
+
+    table holds the (profiles, actions, features) feature matrix. Returns per profile metric arrays
+    aligned with test_profiles.
+    """
+    n_profiles, n_actions, _ = table.shape
+    test = np.isin(profile, test_profiles)
+    train = ~test
+
+    ranker = train_ranker(
+        table[profile[train], action_a[train]],
+        table[profile[train], action_b[train]],
+        labels[train],
+    )
+    utilities = ranker.utilities(table)  # (profiles, actions)
+
+    p, a, b, y = profile[test], action_a[test], action_b[test], labels[test]
+    relevance, seen = win_rate_relevance(n_profiles, n_actions, p, a, b, y)
+    u, r, s = utilities[test_profiles], relevance[test_profiles], seen[test_profiles]
+
+    return {
+        "profile": test_profiles,
+        "pairwise_accuracy": pairwise_accuracy(utilities, p, a, b, y)[test_profiles],
+        "kendall_tau": kendall_tau(u, r, s),
+        "ndcg": ndcg_at_k(u, r, s, k),
+    }
+
+
+def cross_validate(index: PairIndex, folds: int = 5, k: int = 10, workers: int | None = None, seed: int = 42) -> dict[str, np.ndarray]:
+    """Per profile metrics, each computed by the fold in which the profile was held out."""
+    static = action_feature_matrix(index.actions)
+    table = np.stack([feature_matrix(index.actions, profile, static=static) for profile in index.profiles])
+    fold_of = assign_folds(len(index.profiles), folds, seed)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                evaluate_fold, table, index.action_a, index.action_b, index.profile, index.labels,
+                np.flatnonzero(fold_of == fold), k,
+            )
+            for fold in range(folds)
+        ]
+        results = [future.result() for future in futures]
+
+    per_profile = {name: np.full(len(index.profiles), np.nan) for name in METRICS}
+    for result in results:
+        for name in METRICS:
+            per_profile[name][result["profile"]] = result[name]
+    return per_profile
+
+
+def summarize_by_segment(index: PairIndex, per_profile: dict[str, np.ndarray], segment_by: str) -> list[dict]:
+    segments, segment_of = np.unique([getattr(p, segment_by) for p in index.profiles], return_inverse=True)
+    rows = []
+    for i, segment in enumerate(segments):
+        members = segment_of == i
+        rows.append({
+            "segment": str(segment),
+            "profiles": int(members.sum()),
+            **{name: float(np.nanmean(per_profile[name][members])) for name in METRICS},
+        })
+    rows.append({
+        "segment": "all",
+        "profiles": len(index.profiles),
+        **{name: float(np.nanmean(per_profile[name])) for name in METRICS},
+    })
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Cross validate the ranker against held out pair judgments.")
+    parser.add_argument("--scores-path", type=Path, default=SCORES_PATH)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--k", type=int, default=10, help="cutoff for NDCG@k")
+    parser.add_argument("--segment-by", choices=SEGMENT_FIELDS, default="income_level")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size, defaults to the CPU count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-pairwise-accuracy", type=float, default=None, help="exit non-zero below this overall accuracy")
+    args = parser.parse_args(argv)
+    # a single fold would hold out every profile and train on nothing
+    if args.folds < 2:
+        parser.error("--folds must be at least 2")
+    if args.k < 1:
+        parser.error("--k must be at least 1")
+
+    index = load_pair_index(args.scores_path)
+    if len(index.profiles) < 2:
+        parser.error("need at least 2 profiles to hold out by profile")
+    folds = min(args.folds, len(index.profiles))
+    per_profile = cross_validate(index, folds=folds, k=args.k, workers=args.workers, seed=args.seed)
+    rows = summarize_by_segment(index, per_profile, args.segment_by)
+
+    print(f"{len(index.labels)} pairs, {len(index.profiles)} profiles, {folds} folds grouped by profile")
+    print(f"{args.segment_by:<20} {'profiles':>8} {'pair_acc':>9} {'kendall':>8} {f'ndcg@{args.k}':>8}")
+    for row in rows:
+        print(
+            f"{row['segment']:<20} {row['profiles']:>8} {row['pairwise_accuracy']:>9.3f} "
+            f"{row['kendall_tau']:>8.3f} {row['ndcg']:>8.3f}"
+        )
+
+    overall = rows[-1]["pairwise_accuracy"]
+    if args.min_pairwise_accuracy is not None and overall < args.min_pairwise_accuracy:
+        print(f"FAILED: pairwise accuracy {overall:.3f} is below {args.min_pairwise_accuracy:.3f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
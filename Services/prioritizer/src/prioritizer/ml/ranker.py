@@ -0,0 +1,205 @@
+# Pairwise ranker over the action catalog. Each action gets a linear utility from the features
+# engineered in notebooks/train_ranker.ipynb, and P(action_a beats action_b) is
+# sigmoid(utility_a - utility_b), so one fitted weight vector both scores pairs and ranks a catalog.
+from dataclasses import dataclass
+from itertools import product
+from typing import get_args
+
+import numpy as np
+
+from prioritizer.models import Action, UserProfile
+
+SPEED_MAP = {"Emergency Brake": 3, "Gradual": 2, "Delayed": 1}
+MODE_MAP = {"Cut Emissions": 1, "Remove Carbon": 2, "Cut Emissions and Remove Carbon": 3}
+
+# Profile independent columns, computed once per catalog
+ACTION_FEATURES = [
+    "ghg_impact",
+    "cost",
+    "speed",
+    "env_benefits",
+    "wellbeing",
+    "adaptation",
+    "mode",
+]
+# Columns that depend on the user profile
+PROFILE_FEATURES = [
+    "sector_match",
+    "cost_feasibility",
+]
+FEATURE_SCHEMA = ACTION_FEATURES + PROFILE_FEATURES
+# The only profile fields PROFILE_FEATURES read. Every profile maps to one cell of this grid, so
+# utilities for the whole grid can be precomputed into a ranking table.
+PROFILE_KEY_FIELDS = ("primary_transport", "energy_source", "diet", "income_level")
+PROFILE_KEY_VALUES = {field: get_args(UserProfile.model_fields[field].annotation) for field in PROFILE_KEY_FIELDS}
+PROFILE_GRID_SHAPE = tuple(len(PROFILE_KEY_VALUES[field]) for field in PROFILE_KEY_FIELDS)
+
+
+def parse_ghg_impact(val: str | None) -> float:
+    """Parse ghg_impact string like '1.40 to 2.80' into a midpoint number."""
+    if val is None:
+        return 0.0
+    val = val.strip()
+    if "to" in val:
+        parts = val.split("to")
+        try:
+            lo = float(parts[0].strip())
+            hi = float(parts[1].strip())
+            return (lo + hi) / 2
+        except ValueError:
+            return 0.0
+    try:
+        return float(val)
+    except ValueError:
+        return 0.0
+
+
+def encode_speed(val: str | None) -> int:
+    if val is None:
+        return 0
+    return SPEED_MAP.get(val.strip(), 0)
+
+
+def count_benefits(val: str | None) -> int:
+    """Count comma-separated benefit items. None = 0."""
+    if val is None:
+        return 0
+    return len([x.strip() for x in val.split(",") if x.strip()])
+
+
+def encode_mode(val: str | None) -> int:
+    if val is None:
+        return 0
+    return MODE_MAP.get(val.strip(), 0)
+
+
+def sector_match(sector: str | None, profile: UserProfile) -> float:
+    """Check if action sector relates to user's primary emission source."""
+    if sector is None:
+        return 0.0
+    sector = sector.lower()
+    if "transport" in sector and profile.primary_transport in ("car", "motorcycle"):
+        return 1.0
+    if ("electricity" in sector or "building" in sector) and profile.energy_source == "grid":
+        return 1.0
+    if "food" in sector and profile.diet in ("heavy_meat", "moderate_meat"):
+        return 1.0
+    return 0.0
+
+
+def cost_feasibility(cost: float | None, profile: UserProfile) -> float:
+    """Is the action cost reasonable for the user's income?"""
+    if cost is None:
+        return 0.5  # unknown cost, neutral
+    if cost < 0:
+        return 1.0  # net savings, always feasible
+    if profile.income_level == "high":
+        return 1.0
+    if profile.income_level == "medium":
+        return 0.5 if cost > 1000 else 1.0
+    # low income
+    return 0.0 if cost > 500 else 0.5
+
+
+def action_feature_matrix(actions: list[Action]) -> np.ndarray:
+    """Profile independent features, one row per action in ACTION_FEATURES order."""
+    return np.array(
+        [
+            [
+                parse_ghg_impact(a.ghg_impact),
+                a.cost or 0.0,
+                encode_speed(a.speed_of_action),
+                count_benefits(a.environment_benefits),
+                count_benefits(a.human_wellbeing_benefits),
+                count_benefits(a.climate_adaptation_benefits),
+                encode_mode(a.mode),
+            ]
+            for a in actions
+        ],
+        dtype=np.float64,
+    ).reshape(len(actions), len(ACTION_FEATURES))
+
+
+def profile_feature_matrix(actions: list[Action], profile: UserProfile) -> np.ndarray:
+    """Profile dependent features, one row per action in PROFILE_FEATURES order."""
+    return np.array(
+        [[sector_match(a.sector, profile), cost_feasibility(a.cost, profile)] for a in actions],
+        dtype=np.float64,
+    ).reshape(len(actions), len(PROFILE_FEATURES))
+
+
+def feature_matrix(actions: list[Action], profile: UserProfile, static: np.ndarray | None = None) -> np.ndarray:
+    """Full FEATURE_SCHEMA matrix. Pass a precomputed action_feature_matrix as static to skip rebuilding it."""
+    if static is None:
+        static = action_feature_matrix(actions)
+    return np.hstack([static, profile_feature_matrix(actions, profile)])
+
+
+def profile_key(profile: UserProfile) -> int:
+    """Row of the ranking table that holds utilities for profile."""
+    return int(np.ravel_multi_index(
+        tuple(PROFILE_KEY_VALUES[field].index(getattr(profile, field)) for field in PROFILE_KEY_FIELDS),
+        PROFILE_GRID_SHAPE,
+    ))
+
+
+def profile_grid() -> list[UserProfile]:
+    """One representative profile per ranking table row, in profile_key order."""
+    return [
+        UserProfile.model_construct(**dict(zip(PROFILE_KEY_FIELDS, values)))
+        for values in product(*(PROFILE_KEY_VALUES[field] for field in PROFILE_KEY_FIELDS))
+    ]
+
+
+@dataclass(frozen=True)
+class Ranker:
+    weights: np.ndarray  # fitted on standardized features
+    scale: np.ndarray  # per-feature standard deviation used for standardization
+    feature_schema: tuple[str, ...] = tuple(FEATURE_SCHEMA)
+
+    @property
+    def effective_weights(self) -> np.ndarray:
+        # folds standardization into the weights so scoring is a single matrix-vector product
+        return self.weights / self.scale
+
+    def utilities(self, features: np.ndarray) -> np.ndarray:
+        return features @ self.effective_weights
+
+    def predict_proba(self, features_a: np.ndarray, features_b: np.ndarray) -> np.ndarray:
+        """Probability that each action in features_a beats the matching action in features_b."""
+        return 1.0 / (1.0 + np.exp(-(self.utilities(features_a) - self.utilities(features_b))))
+
+    def ranking_table(self, actions: list[Action], static: np.ndarray | None = None) -> np.ndarray:
+        """Utilities of every action for every profile_grid() cell, shape (grid cells, actions)."""
+        if static is None:
+            static = action_feature_matrix(actions)
+        return np.stack([self.utilities(feature_matrix(actions, profile, static=static)) for profile in profile_grid()])
+
+
+def pairwise_correct(utilities_a: np.ndarray, utilities_b: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Whether each judged pair is ordered like its label (1 = action_a better). A tie is never correct."""
+    return np.sign(utilities_a - utilities_b) == np.where(labels == 1, 1.0, -1.0)
+
+
+def train_ranker(features_a: np.ndarray, features_b: np.ndarray, labels: np.ndarray, l2: float = 1.0, iterations: int = 25) -> Ranker:
+    """Fit pairwise logistic regression on feature differences with Newton's method.
+
+    labels are 1 where action_a was judged better and 0 where action_b was.
+    """
+    diff = features_a - features_b
+    scale = np.vstack([features_a, features_b]).std(axis=0)
+    scale[scale == 0] = 1.0
+    x = diff / scale
+    y = np.asarray(labels, dtype=np.float64)
+
+    weights = np.zeros(x.shape[1])
+    regularizer = l2 * np.eye(x.shape[1])
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights)))
+        gradient = x.T @ (p - y) + regularizer @ weights
+        hessian = (x * (p * (1 - p))[:, None]).T @ x + regularizer
+        step = np.linalg.solve(hessian, gradient)
+        weights -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    return Ranker(weights=weights, scale=scale)
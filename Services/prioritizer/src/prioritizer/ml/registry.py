@@ -0,0 +1,147 @@
+# Serves the current ranker version and hot swaps to newly published versions without a restart.
+# A background thread watches current.json; when it changes, the new version and its derived caches
+# are built off the request path and then swapped in with a single reference assignment. Request
+# handlers only ever read that reference, so they never take a lock or see a partially loaded model.
+#
+# With a snapshot directory configured (see snapshot.py) the derived arrays are shared between
+# worker processes: the first process to load a version writes them, the others memory map them.
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from prioritizer.ml.artifacts import MODEL_DIR, POINTER_FILE, ArtifactError, current_version, load_ranker
+from prioritizer.ml.ranker import FEATURE_SCHEMA, Ranker, action_feature_matrix, profile_key
+from prioritizer.ml.selection import CatalogColumns, catalog_columns
+from prioritizer.ml.snapshot import attach_snapshot, prune_snapshots, snapshot_dir_from_env, write_snapshot
+from prioritizer.models import Action, UserProfile
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    version: str
+    ranker: Ranker
+    manifest: dict
+    # derived caches, rebuilt with every version so they always match the ranker they are used with
+    actions: list[Action]
+    ranking_table: np.ndarray  # (profile grid cells, actions), see ranker.profile_grid
+    columns: CatalogColumns  # filter and diversity columns for ml.selection
+
+    def score(self, profile: UserProfile) -> np.ndarray:
+        """Utility of every catalog action for profile, aligned with self.actions."""
+        return self.ranking_table[profile_key(profile)]
+
+
+class ModelRegistry:
+    def __init__(self, model_dir: Path = MODEL_DIR, poll_interval: float = POLL_INTERVAL_SECONDS, snapshot_dir: Path | None = None):
+        self.model_dir = model_dir
+        self.snapshot_dir = snapshot_dir
+        self.poll_interval = poll_interval
+        self._active: LoadedModel | None = None
+        self._actions: list[Action] = []
+        self._catalog_hash: str | None = None
+        self._pointer_stat: tuple[int, int] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def active(self) -> LoadedModel | None:
+        return self._active
+
+    def load(self, actions: list[Action], catalog_hash: str):
+        """Load the current version for the given catalog. Safe to call before start()."""
+        self._actions = actions
+        self._catalog_hash = catalog_hash
+        self._pointer_stat = None
+        self.reload_if_changed()
+
+    def reload_if_changed(self) -> bool:
+        pointer = self.model_dir / POINTER_FILE
+        try:
+            stat = pointer.stat()
+            pointer_stat = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pointer_stat = None
+        if pointer_stat == self._pointer_stat:
+            return False
+        self._pointer_stat = pointer_stat
+
+        version = current_version(self.model_dir)
+        if version is None or (self._active is not None and self._active.version == version):
+            return False
+        try:
+            loaded = self._build(version)
+        except ArtifactError:
+            logger.exception("Failed to load ranker version %s, keeping %s", version, self._active and self._active.version)
+            return False
+        self._active = loaded
+        logger.info("Serving ranker version %s", version)
+        if self.snapshot_dir is not None:
+            prune_snapshots(self.snapshot_dir, version)
+        return True
+
+    def _build(self, version: str) -> LoadedModel:
+        if self.snapshot_dir is not None:
+            snapshot = attach_snapshot(self.snapshot_dir, version, self._catalog_hash)
+            if snapshot is not None:
+                manifest, arrays = snapshot
+                logger.info("Attached shared snapshot of ranker version %s", version)
+                return LoadedModel(
+                    version=version,
+                    ranker=Ranker(weights=arrays["weights"], scale=arrays["scale"], feature_schema=tuple(manifest["feature_schema"])),
+                    manifest=manifest,
+                    actions=self._actions,
+                    ranking_table=arrays["ranking_table"],
+                    columns=catalog_columns(self._actions),
+                )
+
+        ranker, manifest = load_ranker(version, self.model_dir)
+        if list(ranker.feature_schema) != FEATURE_SCHEMA:
+            raise ArtifactError(f"Ranker version {version} has feature schema {ranker.feature_schema}, expected {FEATURE_SCHEMA}")
+        if manifest.get("catalog_hash") != self._catalog_hash:
+            logger.warning("Ranker version %s was trained against a different action catalog", version)
+        ranking_table = ranker.ranking_table(self._actions, static=action_feature_matrix(self._actions))
+
+        if self.snapshot_dir is not None:
+            write_snapshot(self.snapshot_dir, version, manifest, self._catalog_hash, {
+                "weights": ranker.weights,
+                "scale": ranker.scale,
+                "ranking_table": ranking_table,
+            })
+        return LoadedModel(
+            version=version,
+            ranker=ranker,
+            manifest=manifest,
+            actions=self._actions,
+            ranking_table=ranking_table,
+            columns=catalog_columns(self._actions),
+        )
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="ranker-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload_if_changed()
+            except Exception:
+                logger.exception("Ranker reload check failed")
+
+
+registry = ModelRegistry(snapshot_dir=snapshot_dir_from_env())
@@ -0,0 +1,187 @@
+# Top-k selection over ranker utilities with filtering, optional MMR diversification over
+# sector/cluster, and stateless cursors for fetching further pages.
+#
+# Pages are selected with a partial partition of the remaining candidates rather than a full sort. A
+# cursor carries just enough state to resume: for plain ranking the (score, index) of the last
+# action served, for diversified ranking the indices served so far, from which the diversity state
+# is rebuilt in one vectorized step.
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+
+import numpy as np
+
+from prioritizer.models import Action
+
+# similarity of two actions for diversification
+SAME_CLUSTER_SIMILARITY = 1.0
+SAME_SECTOR_SIMILARITY = 0.5
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class CatalogColumns:
+    sector: np.ndarray  # object arrays of the raw values, for filtering
+    mode: np.ndarray
+    cost: np.ndarray  # float, nan where unknown
+    sector_code: np.ndarray  # int codes for similarity, -1 where unknown
+    cluster_code: np.ndarray
+
+
+def _codes(values: list[str | None]) -> np.ndarray:
+    index: dict[str, int] = {}
+    return np.array([-1 if v is None else index.setdefault(v, len(index)) for v in values], dtype=np.intp)
+
+
+def catalog_columns(actions: list[Action]) -> CatalogColumns:
+    return CatalogColumns(
+        sector=np.array([a.sector for a in actions], dtype=object),
+        mode=np.array([a.mode for a in actions], dtype=object),
+        cost=np.array([np.nan if a.cost is None else a.cost for a in actions], dtype=np.float64),
+        sector_code=_codes([a.sector for a in actions]),
+        cluster_code=_codes([a.cluster for a in actions]),
+    )
+
+
+def filter_mask(columns: CatalogColumns, sector: str | None = None, mode: str | None = None, max_cost: float | None = None) -> np.ndarray:
+    """Actions matching every given filter. Actions with unknown cost never pass a max_cost filter."""
+    mask = np.ones(len(columns.cost), dtype=bool)
+    if sector is not None:
+        mask &= columns.sector == sector
+    if mode is not None:
+        mask &= columns.mode == mode
+    if max_cost is not None:
+        with np.errstate(invalid="ignore"):
+            mask &= columns.cost <= max_cost
+    return mask
+
+
+def top_k(scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best candidates by (-score, index): best first, ties broken by lower index."""
+    if k <= 0 or len(candidates) == 0:
+        return candidates[:0]
+    if k < len(candidates):
+        s = scores[candidates]
+        kth = np.partition(-s, k - 1)[k - 1]
+        # partitioning picks arbitrary members of a group tied with the k-th score, so take the whole
+        # boundary group and keep its lowest indices; after() relies on exactly this order
+        better = candidates[-s < kth]
+        tied = np.sort(candidates[-s == kth])[:k - len(better)]
+        candidates = np.concatenate([better, tied])
+    # only the k selected are sorted; lexsort uses the last key as primary
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def after(scores: np.ndarray, candidates: np.ndarray, last_score: float, last_index: int) -> np.ndarray:
+    """Candidates ranked after (last_score, last_index) in top_k order."""
+    s = scores[candidates]
+    return candidates[(s < last_score) | ((s == last_score) & (candidates > last_index))]
+
+
+def similarity_to(columns: CatalogColumns, selected: np.ndarray) -> np.ndarray:
+    """Max similarity of every action to any of the selected actions."""
+    if len(selected) == 0:
+        return np.zeros(len(columns.cost))
+    sector, cluster = columns.sector_code, columns.cluster_code
+    same_cluster = (cluster[:, None] == cluster[selected][None, :]) & (cluster[selected][None, :] >= 0)
+    same_sector = (sector[:, None] == sector[selected][None, :]) & (sector[selected][None, :] >= 0)
+    similarity = np.where(same_cluster, SAME_CLUSTER_SIMILARITY, np.where(same_sector, SAME_SECTOR_SIMILARITY, 0.0))
+    return similarity.max(axis=1)
+
+
+def mmr_select(
+    scores: np.ndarray,
+    candidates: np.ndarray,
+    columns: CatalogColumns,
+    k: int,
+    diversity: float,
+    served: np.ndarray,
+    relevance_range: tuple[float, float],
+) -> np.ndarray:
+    """Greedy maximal marginal relevance: pick, k times, the candidate maximizing
+    (1 - diversity) * relevance - diversity * max similarity to everything served so far.
+
+    Relevance is the score min-max normalized over relevance_range. Keep the range fixed for a query
+    (the span of the whole filtered set) so that paging gives the same picks as one long page.
+    """
+    if len(candidates) == 0:
+        return candidates
+    low, high = relevance_range
+    relevance = (scores[candidates] - low) / (high - low) if high > low else np.ones(len(candidates))
+    max_similarity = similarity_to(columns, served)[candidates]
+
+    picked = []
+    available = np.ones(len(candidates), dtype=bool)
+    for _ in range(min(k, len(candidates))):
+        objective = np.where(available, (1 - diversity) * relevance - diversity * max_similarity, -np.inf)
+        best = int(np.argmax(objective))
+        picked.append(candidates[best])
+        available[best] = False
+        # incremental update: only the newly picked action can raise an action's max similarity
+        max_similarity = np.maximum(max_similarity, similarity_to(columns, candidates[best:best + 1])[candidates])
+    return np.array(picked, dtype=np.intp)
+
+
+def select_page(
+    scores: np.ndarray,
+    candidates: np.ndarray,
+    columns: CatalogColumns,
+    k: int,
+    diversify: bool,
+    diversity: float,
+    state: dict,
+) -> tuple[np.ndarray, dict, bool]:
+    """Select the page after the one described by state ({} for the first page).
+
+    Returns the page, the state to put in the next cursor and whether the ranking is exhausted.
+    """
+    if diversify:
+        served = np.array(state.get("served", []), dtype=np.intp)
+        remaining = np.setdiff1d(candidates, served)
+        relevance_range = (float(scores[candidates].min()), float(scores[candidates].max())) if len(candidates) else (0.0, 0.0)
+        page = mmr_select(scores, remaining, columns, k, diversity, served, relevance_range)
+        next_state = {"served": np.concatenate([served, page]).tolist()}
+    else:
+        remaining = after(scores, candidates, state["score"], state["index"]) if state else candidates
+        page = top_k(scores, remaining, k)
+        next_state = {"score": float(scores[page[-1]]), "index": int(page[-1])} if len(page) else {}
+    return page, next_state, len(page) == len(remaining)
+
+
+def query_fingerprint(*parts) -> str:
+    """Short hash of everything a cursor is only valid for (profile, filters, diversification)."""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:16]
+
+
+def encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _is_index(value, n_actions: int) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < n_actions
+
+
+def decode_cursor(cursor: str, n_actions: int, diversify: bool) -> dict:
+    """Decode a cursor and check it has the shape select_page expects for this kind of ranking."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(state, dict) or not isinstance(state.get("model_version"), str) or not isinstance(state.get("query"), str):
+        raise InvalidCursor("Malformed cursor")
+
+    if diversify:
+        served = state.get("served")
+        if not isinstance(served, list) or not all(_is_index(i, n_actions) for i in served) or len(set(served)) != len(served):
+            raise InvalidCursor("Malformed cursor")
+    else:
+        score = state.get("score")
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not np.isfinite(score):
+            raise InvalidCursor("Malformed cursor")
+        if not _is_index(state.get("index"), n_actions):
+            raise InvalidCursor("Malformed cursor")
+    return state
@@ -0,0 +1,77 @@
+# Read-only model snapshots shared between server worker processes. The serving master writes the
+# arrays a worker needs for a model version (weights, ranking table) as .npy files once, and
+# workers memory map them instead of rebuilding their own copies. The pages are
+# backed by the same files, so they are shared through the OS page cache and per-worker memory stays
+# flat as workers are added. Put the snapshot directory on tmpfs (/dev/shm) to keep it in RAM.
+#
+#   <snapshot_dir>/<version>/manifest.json, weights.npy, scale.npy, ranking_table.npy
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+SNAPSHOT_DIR_ENV = "PRIORITIZER_SNAPSHOT_DIR"
+ARRAYS = ("weights", "scale", "ranking_table")
+
+
+def snapshot_dir_from_env() -> Path | None:
+    value = os.environ.get(SNAPSHOT_DIR_ENV)
+    return Path(value) if value else None
+
+
+def write_snapshot(snapshot_dir: Path, version: str, manifest: dict, catalog_hash: str, arrays: dict[str, np.ndarray]):
+    """Write a version's arrays. A no-op if another process already published this version."""
+    target = snapshot_dir / version
+    if target.exists():
+        return
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=snapshot_dir, prefix=f".{version}."))
+    try:
+        for name in ARRAYS:
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(arrays[name]))
+        (staging / "manifest.json").write_text(json.dumps({**manifest, "snapshot_catalog_hash": catalog_hash}))
+        os.replace(staging, target)
+    except OSError:
+        # lost the race to another writer, whose snapshot is just as good
+        shutil.rmtree(staging, ignore_errors=True)
+        if not target.exists():
+            raise
+
+
+def attach_snapshot(snapshot_dir: Path, version: str, catalog_hash: str) -> tuple[dict, dict[str, np.ndarray]] | None:
+    """Memory map a version's arrays read-only. Returns None if there is no usable snapshot."""
+    target = snapshot_dir / version
+    try:
+        manifest = json.loads((target / "manifest.json").read_text())
+    except FileNotFoundError:
+        return None
+    if manifest.pop("snapshot_catalog_hash", None) != catalog_hash:
+        return None
+    return manifest, {name: np.load(target / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+
+
+def _created_at(path: Path) -> str | None:
+    try:
+        return json.loads((path / "manifest.json").read_text())["created_at"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def prune_snapshots(snapshot_dir: Path, active_version: str):
+    """Remove snapshots of versions published before active_version.
+
+    Newer snapshots another worker may have just written are kept. Workers still serving a removed
+    version keep their mappings valid until they swap.
+    """
+    active_created_at = _created_at(snapshot_dir / active_version)
+    if active_created_at is None:
+        return
+    for path in snapshot_dir.iterdir():
+        if path.name.startswith(".") or path.name == active_version or not path.is_dir():
+            continue
+        created_at = _created_at(path)
+        if created_at is not None and created_at < active_created_at:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,74 @@
+# Trains the ranker on the LLM judged action pairs and publishes it as a new model version.
+# Running workers pick the new version up on their next poll, no restart needed.
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from prioritizer.catalog import catalog_hash
+from prioritizer.ml.artifacts import publish_ranker
+from prioritizer.ml.ranker import action_feature_matrix, feature_matrix, pairwise_correct, train_ranker
+from prioritizer.models import Action, ActionPairRecord, UserProfile, load_action_pairs
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SCORES_PATH = DATA_DIR / "synthetic_action_pair_scores.json"
+
+
+class PairIndex(NamedTuple):
+    actions: list[Action]
+    profiles: list[UserProfile]
+    action_a: np.ndarray  # index into actions, one per pair
+    action_b: np.ndarray
+    profile: np.ndarray  # index into profiles, one per pair
+    labels: np.ndarray
+
+
+def index_pairs(records: list[ActionPairRecord]) -> PairIndex:
+    # records share interned action/profile instances, so identity is enough to index them
+    action_ids: dict[int, int] = {}
+    profile_ids: dict[int, int] = {}
+    actions: list[Action] = []
+    profiles: list[UserProfile] = []
+
+    def index_of(instance, ids, items):
+        key = id(instance)
+        if key not in ids:
+            ids[key] = len(items)
+            items.append(instance)
+        return ids[key]
+
+    action_a = np.array([index_of(r.action_a, action_ids, actions) for r in records], dtype=np.intp)
+    action_b = np.array([index_of(r.action_b, action_ids, actions) for r in records], dtype=np.intp)
+    profile = np.array([index_of(r.user_profile, profile_ids, profiles) for r in records], dtype=np.intp)
+    labels = np.array([r.score for r in records], dtype=np.float64)
+    return PairIndex(actions, profiles, action_a, action_b, profile, labels)
+
+
+def pair_features(index: PairIndex) -> tuple[np.ndarray, np.ndarray]:
+    """Feature rows for both sides of every pair, computed once per (profile, action) and gathered."""
+    static = action_feature_matrix(index.actions)
+    # (profiles, actions, features)
+    table = np.stack([feature_matrix(index.actions, profile, static=static) for profile in index.profiles])
+    return table[index.profile, index.action_a], table[index.profile, index.action_b]
+
+
+def load_pair_index(scores_path: Path = SCORES_PATH) -> PairIndex:
+    # the scores file is written from validated models, so it takes the trusted construction path
+    with open(scores_path, "rb") as f:
+        return index_pairs(load_action_pairs(f.read(), trusted=True))
+
+
+def load_pair_features(scores_path: Path = SCORES_PATH) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    index = load_pair_index(scores_path)
+    features_a, features_b = pair_features(index)
+    return features_a, features_b, index.labels
+
+
+if __name__ == "__main__":
+    features_a, features_b, labels = load_pair_features()
+    ranker = train_ranker(features_a, features_b, labels)
+    # same tie handling as the pairwise accuracy gate in ml/evaluate.py
+    accuracy = float(pairwise_correct(ranker.utilities(features_a), ranker.utilities(features_b), labels).mean())
+    version = publish_ranker(ranker, catalog_hash(), metrics={"train_pairwise_accuracy": accuracy, "pairs": len(labels)})
+    print(f"Trained on {len(labels)} pairs, train pairwise accuracy {accuracy:.3f}")
+    print(f"Published ranker version {version}")
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, field_validator
-from typing import Literal
+import json
+from typing import Literal, NamedTuple
+
+from pydantic import BaseModel, TypeAdapter, field_validator
 
 
 class Action(BaseModel):
@@ -41,4 +43,85 @@ class UserProfile(BaseModel):
     diet: Literal["heavy_meat", "moderate_meat", "vegetarian", "vegan"]
     housing_type: Literal["apartment", "house"]
     energy_source: Literal["grid", "solar", "generator"]
-    income_level: Literal["low", "medium", "high"]
\ No newline at end of file
+    income_level: Literal["low", "medium", "high"]
+
+
+class UserProfiles(BaseModel):
+    profiles: list[UserProfile]
+
+
+ActionList = TypeAdapter(list[Action])
+
+
+class ModelInterner[M: BaseModel]:
+    """Keeps one instance per distinct set of field values, so data repeated across many rows
+    (the same action or profile in every pair) is validated and held in memory once."""
+
+    def __init__(self, model: type[M], trusted: bool = False):
+        self.model = model
+        self.trusted = trusted
+        self._pool: dict[tuple, M] = {}
+        self._raw: dict[tuple, M] = {}
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def values(self) -> list[M]:
+        return list(self._pool.values())
+
+    def intern(self, instance: M) -> M:
+        return self._pool.setdefault(tuple(instance.__dict__.values()), instance)
+
+    def from_raw(self, row: dict) -> M:
+        key = tuple(row.get(field) for field in self.model.model_fields)
+        instance = self._raw.get(key)
+        if instance is None:
+            # trusted rows were produced by model_dump() of an already validated model
+            instance = self.model.model_construct(**row) if self.trusted else self.model.model_validate(row)
+            instance = self._raw[key] = self.intern(instance)
+        return instance
+
+
+class ActionPairRecord(NamedTuple):
+    action_a: Action
+    action_b: Action
+    user_profile: UserProfile
+    score: int | None = None
+
+
+def load_actions_json(data: str | bytes) -> list[Action]:
+    """Validate a JSON array of actions in one pass, interning duplicates."""
+    interner = ModelInterner(Action)
+    return [interner.intern(action) for action in ActionList.validate_json(data)]
+
+
+def load_profiles_json(data: str | bytes) -> list[UserProfile]:
+    """Validate a synthetic profiles file ({"profiles": [...]}), interning duplicates."""
+    interner = ModelInterner(UserProfile)
+    return [interner.intern(profile) for profile in UserProfiles.model_validate_json(data).profiles]
+
+
+def construct_actions_json(data: str | bytes) -> list[Action]:
+    """Trusted path for a JSON array of actions that was already validated, e.g. the actions.json
+    written by scripts/action_loader.py from Action.model_dump()."""
+    interner = ModelInterner(Action, trusted=True)
+    return [interner.from_raw(row) for row in json.loads(data)]
+
+
+def load_action_pairs(data: str | bytes, trusted: bool = False) -> list[ActionPairRecord]:
+    """Load action combinations or scored pairs.
+
+    Each distinct action and profile is validated (or, when trusted, constructed) once and shared
+    by every pair it appears in, instead of being rebuilt per pair.
+    """
+    actions = ModelInterner(Action, trusted)
+    profiles = ModelInterner(UserProfile, trusted)
+    return [
+        ActionPairRecord(
+            action_a=actions.from_raw(row["action_a"]),
+            action_b=actions.from_raw(row["action_b"]),
+            user_profile=profiles.from_raw(row["user_profile"]),
+            score=row.get("score"),
+        )
+        for row in json.loads(data)
+    ]
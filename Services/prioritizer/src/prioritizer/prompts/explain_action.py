@@ -0,0 +1,39 @@
+import asyncio
+from prioritizer.clients import get_async_openai_client
+from prioritizer.models import Action
+from prioritizer.rag.retriever import retrieve
+
+
+async def generate_action_explanation(action: Action) -> str:
+    # embedding and retrieval use the blocking clients, keep them off the event loop
+    context = await asyncio.to_thread(retrieve, f"{action.action} {action.solution}")
+    sources = "\n\n".join(f"[{meta['source']}]\n{doc}" for doc, meta, _ in context)
+
+    response = await get_async_openai_client().responses.create(
+        model="gpt-5-mini-2025-08-07",
+        input=[
+            {
+                "role": "system",
+                "content": (
+                    "You are a climate action expert. Explain a climate action to an individual in plain language: "
+                    "what it is, how it reduces greenhouse gas emissions, what it costs, and its co-benefits. "
+                    "Ground the explanation in the provided reference material and keep it under 200 words."
+                )
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"ACTION:\n"
+                    f"- Solution: {action.action} {action.solution}\n"
+                    f"- Sector: {action.sector}\n"
+                    f"- GHG Impact (Gt CO2): {action.ghg_impact}\n"
+                    f"- Cost ($/t CO2): {action.cost}\n"
+                    f"- Speed of action: {action.speed_of_action}\n"
+                    f"- Environment benefits: {action.environment_benefits}\n"
+                    f"- Wellbeing benefits: {action.human_wellbeing_benefits}\n\n"
+                    f"REFERENCE MATERIAL:\n{sources or 'None found.'}"
+                )
+            }
+        ]
+    )
+    return response.output_text
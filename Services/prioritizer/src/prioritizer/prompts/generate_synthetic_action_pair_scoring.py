@@ -1,14 +1,11 @@
 import asyncio
-from openai import AsyncOpenAI
-from prioritizer.settings import settings
-from prioritizer.models import UserProfile, Action
+from prioritizer.clients import get_async_openai_client
+from prioritizer.models import ActionPairRecord, UserProfile, Action, load_action_pairs
 from pydantic import BaseModel
 from typing import Literal
 from pathlib import Path
 import json
 
-client = AsyncOpenAI(api_key=settings.openai_api_key)
-
 CONCURRENCY = 10
 
 class ActionPair(BaseModel):
@@ -28,7 +25,7 @@ class ScoredActionPair(BaseModel):
 
 async def generate_synthetic_action_pair_scoring(action_a: Action, action_b: Action, user_profile: UserProfile) -> int:
 
-    response = await client.responses.parse(
+    response = await get_async_openai_client().responses.parse(
         model="gpt-5-mini-2025-08-07",
         input=[
             {
@@ -103,12 +100,10 @@ async def generate_synthetic_action_pair_scoring(action_a: Action, action_b: Act
 completed_count = 0
 failed_count = 0
 
-async def score_combo(i: int, total: int, combo: dict, semaphore: asyncio.Semaphore) -> dict | None:
+async def score_combo(i: int, total: int, combo: ActionPairRecord, semaphore: asyncio.Semaphore) -> dict | None:
     global completed_count, failed_count
     async with semaphore:
-        action_a = Action(**combo['action_a'])
-        action_b = Action(**combo['action_b'])
-        user_profile = UserProfile(**combo['user_profile'])
+        action_a, action_b, user_profile, _ = combo
 
         try:
             score = await generate_synthetic_action_pair_scoring(action_a, action_b, user_profile)
@@ -132,8 +127,9 @@ async def main():
     action_pairing_path = data_dir / "synthetic_action_combinations.json"
     action_scores_path = data_dir / "synthetic_action_pair_scores.json"
 
-    with open(action_pairing_path, "r") as f:
-        action_combinations = json.load(f)
+    # each distinct action and profile is validated once and shared across all of its pairs
+    with open(action_pairing_path, "rb") as f:
+        action_combinations = load_action_pairs(f.read())
 
     total = len(action_combinations)
     print(f"Starting scoring of {total} action combinations with {CONCURRENCY} concurrent workers...", flush=True)
@@ -1,18 +1,11 @@
 from pathlib import Path
-from openai import OpenAI
-from prioritizer.settings import settings
-from prioritizer.models import UserProfile
-from pydantic import BaseModel
+from prioritizer.clients import get_openai_client
+from prioritizer.models import UserProfiles
 
 
-client = OpenAI(api_key=settings.openai_api_key)
-
-class UserProfiles(BaseModel):
-    profiles: list[UserProfile]
-
 def generate_synthetic_profiles(num_profiles: int = 25) -> UserProfiles:
 
-    response = client.responses.parse(
+    response = get_openai_client().responses.parse(
         model="gpt-5-mini-2025-08-07",
         input=[
             {
@@ -0,0 +1,104 @@
+# Near-duplicate detection for text chunks with MinHash signatures and LSH banding. Used at ingest
+# to skip embedding chunks that repeat content already in the collection (overlapping wiki and
+# drawdown pages, splitter overlap) and at query time to collapse near-identical hits.
+import re
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def choose_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """Pick (bands, rows) with bands * rows == num_perm whose LSH S-curve midpoint, (1/b)^(1/r), is closest to threshold."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+@dataclass
+class DedupStats:
+    chunks_seen: int = 0
+    chunks_dropped: int = 0
+    chars_seen: int = 0
+    chars_dropped: int = 0
+
+    @property
+    def chunks_kept(self) -> int:
+        return self.chunks_seen - self.chunks_dropped
+
+    def __str__(self) -> str:
+        saved = self.chunks_dropped / self.chunks_seen if self.chunks_seen else 0.0
+        return (
+            f"kept {self.chunks_kept}/{self.chunks_seen} chunks, dropped {self.chunks_dropped} near duplicates "
+            f"({saved:.1%} fewer embeddings, {self.chars_dropped} of {self.chars_seen} characters)"
+        )
+
+
+class MinHashDeduplicator:
+    """Incremental near-duplicate index. add() returns the key of an already indexed chunk whose
+    estimated Jaccard similarity (over word shingles) is at least threshold, or indexes the new chunk."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        # universal hash family h(x) = ((a * x + b) mod p) & MAX_HASH, as in datasketch. a and b span
+        # the whole field [0, p); the uint64 multiply wraps deliberately, which mixes the bits
+        # so that each permutation orders the shingles independently of their raw hash values
+        self._a = rng.integers(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._buckets: list[dict[bytes, list[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: dict[str, np.ndarray] = {}
+        self.stats = DedupStats()
+
+    def shingles(self, text: str) -> np.ndarray:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if len(tokens) < self.shingle_size:
+            grams = [" ".join(tokens)]
+        else:
+            grams = [" ".join(tokens[i:i + self.shingle_size]) for i in range(len(tokens) - self.shingle_size + 1)]
+        return np.unique(np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams)))
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.signature_of(self.shingles(text))
+
+    def signature_of(self, hashes: np.ndarray) -> np.ndarray:
+        """MinHash signature of a set of 32 bit shingle hashes."""
+        return (((np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME) & MAX_HASH).min(axis=0)
+
+    @staticmethod
+    def similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+        return float((signature_a == signature_b).mean())
+
+    def find(self, signature: np.ndarray) -> str | None:
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            candidates.update(buckets.get(self._band_key(signature, band), ()))
+        best, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = self.similarity(self._signatures[key], signature)
+            if similarity >= best_similarity:
+                best, best_similarity = key, similarity
+        return best
+
+    def add(self, key: str, text: str) -> str | None:
+        signature = self.signature(text)
+        self.stats.chunks_seen += 1
+        self.stats.chars_seen += len(text)
+        duplicate_of = self.find(signature)
+        if duplicate_of is not None:
+            self.stats.chunks_dropped += 1
+            self.stats.chars_dropped += len(text)
+            return duplicate_of
+        self._signatures[key] = signature
+        for band, buckets in enumerate(self._buckets):
+            buckets.setdefault(self._band_key(signature, band), []).append(key)
+        return None
+
+    def _band_key(self, signature: np.ndarray, band: int) -> bytes:
+        return signature[band * self.rows:(band + 1) * self.rows].tobytes()
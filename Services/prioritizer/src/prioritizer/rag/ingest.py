@@ -1,53 +1,110 @@
-import chromadb
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from openai import OpenAI
-from prioritizer.settings import settings
 import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-client = OpenAI(api_key=settings.openai_api_key)
-chroma_client = chromadb.PersistentClient(path=settings.chroma_db_path)
-collection = chroma_client.get_or_create_collection(name="prioritizer_rag_collection", metadata={"hnsw:space": "cosine"})
+from prioritizer.clients import get_chroma_client, get_openai_client
+from prioritizer.rag.dedup import DedupStats, MinHashDeduplicator
+from prioritizer.settings import get_settings
 
-splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100, separators=["\n\n", "\n", " ", ""])
+if TYPE_CHECKING:
+    from chromadb.api.models.Collection import Collection
+    from langchain_core.documents import Document
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-DOCUMENTS_DIR = settings.documents_dir
+COLLECTION_NAME = "prioritizer_rag_collection"
+
+
+@lru_cache(maxsize=1)
+def get_collection() -> "Collection":
+    return get_chroma_client().get_or_create_collection(name=COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+
+
+@lru_cache(maxsize=1)
+def get_splitter() -> "RecursiveCharacterTextSplitter":
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100, separators=["\n\n", "\n", " ", ""])
+
+
+def split_documents(documents_dir: str, root_dir: str | None = None) -> list[tuple[str, list["Document"]]]:
+    """Split every .txt file under documents_dir into chunks, as (relative path, chunks) per file."""
+    # source paths are stored relative to the top-level documents directory
+    root_dir = root_dir or documents_dir
+    splitter = get_splitter()
+    files = []
 
-def ingest_documents(documents_dir: str = DOCUMENTS_DIR):
     # Iterate through all text files in the documents directory
-    for filename in os.listdir(documents_dir):
-        # if subfolder, recursively ingest
+    for filename in sorted(os.listdir(documents_dir)):
+        # if subfolder, recursively split
         filepath = os.path.join(documents_dir, filename)
         if os.path.isdir(filepath):
-            ingest_documents(filepath)
+            files.extend(split_documents(filepath, root_dir))
         elif filename.endswith(".txt"):
-            rel_path = os.path.relpath(filepath, DOCUMENTS_DIR)
+            rel_path = os.path.relpath(filepath, root_dir)
             with open(filepath, "r", encoding="utf-8") as f:
-                text = f.read()
-                chunks = splitter.create_documents([text], metadatas=[{"source": rel_path}])
-                # embed all chunks for a file  in a batch to minimize API calls
-                response = client.embeddings.create(input=[chunk.page_content for chunk in chunks], model="text-embedding-3-small")
-        
-                # Add the chunks and their embeddings to ChromaDB
-                ids = []
-                embeddings = []
-                metadatas = []
-                documents = []
+                files.append((rel_path, splitter.create_documents([f.read()], metadatas=[{"source": rel_path}])))
+    return files
+
+
+def ingest_documents(documents_dir: str | None = None, dedup_threshold: float | None = None) -> DedupStats:
+    settings = get_settings()
+    documents_dir = documents_dir or settings.documents_dir
+    dedup = MinHashDeduplicator(threshold=dedup_threshold if dedup_threshold is not None else settings.dedup_threshold)
+    client = get_openai_client()
+    collection = get_collection()
+
+    # drop near-duplicate chunks across the whole corpus before paying to embed them; the kept
+    # chunk records the sources of the chunks merged into it
+    kept_chunks: dict[str, "Document"] = {}
+    dropped_ids = []
+    for rel_path, chunks in split_documents(documents_dir):
+        for i, chunk in enumerate(chunks):
+            chunk_id = f"{rel_path}_{i}"
+            duplicate_of = dedup.add(chunk_id, chunk.page_content)
+            if duplicate_of is None:
+                kept_chunks[chunk_id] = chunk
+                continue
+            dropped_ids.append(chunk_id)
+            kept = kept_chunks[duplicate_of]
+            sources = [source for source in kept.metadata.get("duplicate_sources", "").split(",") if source]
+            if rel_path != kept.metadata["source"] and rel_path not in sources:
+                kept.metadata["duplicate_sources"] = ",".join(sources + [rel_path])
+
+    # embed the kept chunks of each file in a batch to minimize API calls
+    by_source: dict[str, list[tuple[str, "Document"]]] = {}
+    for chunk_id, chunk in kept_chunks.items():
+        by_source.setdefault(chunk.metadata["source"], []).append((chunk_id, chunk))
+
+    for rel_path, file_chunks in by_source.items():
+        response = client.embeddings.create(input=[chunk.page_content for _, chunk in file_chunks], model="text-embedding-3-small")
+
+        # Add the chunks and their embeddings to ChromaDB
+        ids = []
+        embeddings = []
+        metadatas = []
+        documents = []
+
+        for (chunk_id, chunk), embedding in zip(file_chunks, response.data):
+            ids.append(chunk_id)
+            documents.append(chunk.page_content)
+            metadatas.append(chunk.metadata)
+            embeddings.append(embedding.embedding)
 
-                for i, (chunk, embedding) in enumerate(zip(chunks, response.data)):
-                    ids.append(f"{rel_path}_{i}")
-                    documents.append(chunk.page_content)
-                    metadatas.append(chunk.metadata)
-                    embeddings.append(embedding.embedding)
+        collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
 
+        print(f"Ingested {len(file_chunks)} chunks from {rel_path}")
 
-                collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+    # remove duplicates left behind by earlier ingests that ran without deduplication
+    if dropped_ids:
+        collection.delete(ids=dropped_ids)
 
-                print(f"Ingested {len(chunks)} chunks from {filename}")
+    print(f"Deduplication: {dedup.stats}")
+    return dedup.stats
 
 
 if __name__ == "__main__":
     ingest_documents()
-    print(f"Total documents in collection: {collection.count()}")
+    print(f"Total documents in collection: {get_collection().count()}")
 
 
 
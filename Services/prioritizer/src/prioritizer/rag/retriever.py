@@ -1,22 +1,49 @@
-import chromadb
-from openai import OpenAI
-from prioritizer.settings import settings
-client = OpenAI(api_key=settings.openai_api_key)
-chroma_client = chromadb.PersistentClient(path=settings.chroma_db_path)
-collection = chroma_client.get_collection(name="prioritizer_rag_collection")
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from prioritizer.clients import get_chroma_client, get_openai_client
+from prioritizer.rag.dedup import MinHashDeduplicator
+from prioritizer.rag.ingest import COLLECTION_NAME
+from prioritizer.settings import get_settings
+
+if TYPE_CHECKING:
+    from chromadb.api.models.Collection import Collection
+
+# extra candidates fetched per requested result, so collapsing near duplicates still fills top_k
+OVERFETCH_FACTOR = 2
+
+
+@lru_cache(maxsize=1)
+def get_collection() -> "Collection":
+    return get_chroma_client().get_collection(name=COLLECTION_NAME)
+
+
+def warmup():
+    # open the collection and create the embedding client ahead of the first query
+    get_collection()
+    get_openai_client()
+
 
 def retrieve(query: str, top_k: int = 5):
 
     # let's embed the query to get the embedding vector
-    query_embedding_response = client.embeddings.create(input=[query], model="text-embedding-3-small")
+    query_embedding_response = get_openai_client().embeddings.create(input=[query], model="text-embedding-3-small")
     query_embedding = query_embedding_response.data[0].embedding
 
     # Retrieve relevant documents from ChromaDB based on the query
-    results = collection.query(query_embeddings=[query_embedding], n_results=top_k, include=["documents", "metadatas", "distances"])
+    results = get_collection().query(query_embeddings=[query_embedding], n_results=top_k * OVERFETCH_FACTOR, include=["documents", "metadatas", "distances"])
 
     filtered_results = [
         (doc, meta, dist) for doc, meta, dist in zip(results["documents"][0], results["metadatas"][0], results["distances"][0])
         if dist < 0.5  # Adjust this threshold based on your needs
     ]
 
-    return filtered_results
\ No newline at end of file
+    # hits arrive closest first, so the kept copy of each near-duplicate group is the best match
+    dedup = MinHashDeduplicator(threshold=get_settings().dedup_threshold)
+    unique_results = [
+        result for i, result in enumerate(filtered_results)
+        if dedup.add(str(i), result[0]) is None
+    ]
+
+    return unique_results[:top_k]
+
@@ -0,0 +1,52 @@
+# Startup-time regression check for the prioritizer service. Imports prioritizer.main in a fresh
+# interpreter under `python -X importtime` and fails if the import exceeds the time budget or if
+# any heavy SDK that should only be loaded lazily is pulled in at import.
+import os
+import subprocess
+import sys
+
+MODULE = "prioritizer.main"
+IMPORT_BUDGET_MS = 1500
+LAZY_PACKAGES = ("chromadb", "langchain", "langchain_text_splitters", "openai", "openpyxl")
+
+
+def measure_import(module: str = MODULE) -> tuple[float, set[str]]:
+    # the child imports the same package the caller sees, e.g. src/ under pytest
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    cumulative_us = None
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"{module} not found in -X importtime output")
+    return cumulative_us / 1000, imported
+
+
+if __name__ == "__main__":
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_MS
+    elapsed_ms, imported = measure_import()
+    eager = sorted(name for name in imported if name.split(".")[0] in LAZY_PACKAGES)
+
+    print(f"import {MODULE}: {elapsed_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    if eager:
+        print(f"FAILED: heavy packages imported eagerly: {', '.join(eager)}")
+        sys.exit(1)
+    if elapsed_ms > budget_ms:
+        print("FAILED: import time over budget")
+        sys.exit(1)
+    print("OK")
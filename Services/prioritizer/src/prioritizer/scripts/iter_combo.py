@@ -1,21 +1,24 @@
 # exists only to help create combination of actions with synthetic user profiles, to create synthetic action pair scoring data. Not intended for production use.
 import random
 from itertools import combinations
-from prioritizer.models import UserProfile, Action
+from prioritizer.models import UserProfile, Action, load_actions_json, load_profiles_json
 import json
 from pathlib import Path
 
 def generate_action_combinations(actions: list[Action], user_profiles: list[UserProfile], pairs_per_profile: int = 150) -> list[dict]:
-    all_pairs = list(combinations(actions, 2))
+    # dump each action and profile once; every pair references the same dicts
+    action_dumps = [action.model_dump() for action in actions]
+    all_pairs = list(combinations(range(len(actions)), 2))
 
     result = []
     for profile in user_profiles:
+        profile_dump = profile.model_dump()
         sampled = random.sample(all_pairs, min(pairs_per_profile, len(all_pairs)))
-        for action_a, action_b in sampled:
+        for a, b in sampled:
             result.append({
-                "action_a": action_a.model_dump(),
-                "action_b": action_b.model_dump(),
-                "user_profile": profile.model_dump()
+                "action_a": action_dumps[a],
+                "action_b": action_dumps[b],
+                "user_profile": profile_dump
             })
 
     return result
@@ -25,13 +28,11 @@ if __name__ == "__main__":
     action_path = data_path / "actions.json"
     profiles_path = data_path / "synthetic_profiles.json"
 
-    with open(action_path, "r") as f:
-        actions_data = json.load(f)
-        actions = [Action(**action) for action in actions_data]
+    with open(action_path, "rb") as f:
+        actions = load_actions_json(f.read())
 
-    with open(profiles_path, "r") as f:
-        profiles_data = json.load(f)
-        user_profiles = [UserProfile(**profile) for profile in profiles_data['profiles']]
+    with open(profiles_path, "rb") as f:
+        user_profiles = load_profiles_json(f.read())
 
     action_combinations = generate_action_combinations(actions, user_profiles, pairs_per_profile=150)
 
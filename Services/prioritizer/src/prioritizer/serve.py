@@ -0,0 +1,45 @@
+# Multi-worker launcher. The master process loads the current ranker version once and writes its
+# derived arrays to a snapshot directory; every uvicorn worker then memory maps that snapshot
+# read-only instead of rebuilding it (see ml/snapshot.py).
+#
+#   python -m prioritizer.serve --workers 4 --port 8000
+import argparse
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from prioritizer.catalog import catalog_hash, load_actions
+from prioritizer.ml.registry import ModelRegistry
+from prioritizer.ml.snapshot import SNAPSHOT_DIR_ENV
+
+
+def default_snapshot_root() -> str | None:
+    # tmpfs keeps the shared pages in memory rather than on disk
+    return "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Serve the prioritizer with workers sharing one model snapshot.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--snapshot-dir", type=Path, default=None, help="defaults to a fresh directory under /dev/shm")
+    args = parser.parse_args(argv)
+
+    owns_snapshot_dir = args.snapshot_dir is None
+    snapshot_dir = args.snapshot_dir or Path(tempfile.mkdtemp(prefix="prioritizer-snapshot-", dir=default_snapshot_root()))
+    try:
+        ModelRegistry(snapshot_dir=snapshot_dir).load(load_actions(), catalog_hash())
+        # workers inherit the environment and attach to the snapshot during warmup
+        os.environ[SNAPSHOT_DIR_ENV] = str(snapshot_dir)
+        uvicorn.run("prioritizer.main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        if owns_snapshot_dir:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
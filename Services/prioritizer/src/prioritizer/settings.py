@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 
@@ -5,8 +7,13 @@ class Settings(BaseSettings):
     openai_api_key: str
     documents_dir: str = ""
     chroma_db_path: str = ""
+    # estimated Jaccard similarity above which two chunks count as near duplicates
+    dedup_threshold: float = 0.8
 
     model_config = {"env_file": ".env"}
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    # resolved on first use so importing the package never requires a configured environment
+    return Settings()
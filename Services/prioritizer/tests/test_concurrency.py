@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from prioritizer.concurrency import AdmissionController, Overloaded, SingleFlight
+
+
+def test_single_flight_shares_one_call_between_identical_keys():
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(20)))
+
+    assert asyncio.run(main()) == ["result"] * 20
+    assert calls == 1
+
+
+def test_single_flight_runs_distinct_keys_and_later_calls_separately():
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        flight = SingleFlight()
+        first = await asyncio.gather(flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b")))
+        second = await flight.do("a", lambda: compute("a"))
+        return first, second
+
+    assert asyncio.run(main()) == (["a", "b"], "a")
+    assert calls == ["a", "b", "a"]
+
+
+def test_single_flight_shares_errors_and_survives_cancelled_callers():
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("upstream failed")
+
+    async def main():
+        flight = SingleFlight()
+        cancelled = asyncio.ensure_future(flight.do("key", fail))
+        waiter = asyncio.ensure_future(flight.do("key", fail))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(ValueError, match="upstream failed"):
+            await waiter
+
+    asyncio.run(main())
+
+
+def test_admission_sheds_bursts_beyond_the_queue():
+    started = 0
+
+    async def work(admission):
+        nonlocal started
+        async with admission.admit():
+            started += 1
+            await asyncio.sleep(0.05)
+
+    async def main():
+        admission = AdmissionController(max_concurrency=2, max_queue=2, max_wait=1.0, retry_after=3.0)
+        return await asyncio.gather(*(work(admission) for _ in range(10)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    shed = [r for r in results if isinstance(r, Overloaded)]
+    # two run straight away and two wait for a slot, the other six are rejected without waiting
+    assert started == 4
+    assert len(shed) == 6
+    assert all(r.retry_after == 3.0 for r in shed)
+
+
+def test_admission_sheds_callers_that_wait_too_long():
+    async def hold(admission, release):
+        async with admission.admit():
+            await release.wait()
+
+    async def main():
+        admission = AdmissionController(max_concurrency=1, max_queue=5, max_wait=0.05)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(admission, release))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            async with admission.admit():
+                pass
+        assert admission.waiting == 0
+        release.set()
+        await holder
+        # the slot is free again once the holder finishes
+        async with admission.admit():
+            pass
+
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from prioritizer.rag import retriever
+from prioritizer.rag.dedup import DedupStats, MinHashDeduplicator
+
+WORDS = [f"w{i}" for i in range(5000)]
+
+
+def random_text(rng, n_words=120):
+    return " ".join(rng.choice(WORDS, size=n_words))
+
+
+def exact_jaccard(dedup, text_a, text_b):
+    a, b = dedup.shingles(text_a), dedup.shingles(text_b)
+    return len(np.intersect1d(a, b)) / len(np.union1d(a, b))
+
+
+def test_estimated_similarity_tracks_exact_jaccard():
+    rng = np.random.default_rng(0)
+    dedup = MinHashDeduplicator()
+    errors = []
+    for _ in range(100):
+        words = list(rng.choice(WORDS, size=150))
+        keep = int(rng.integers(0, 150))
+        other = words[:keep] + list(rng.choice(WORDS, size=150 - keep))
+        text_a, text_b = " ".join(words), " ".join(other)
+        estimate = dedup.similarity(dedup.signature(text_a), dedup.signature(text_b))
+        errors.append(estimate - exact_jaccard(dedup, text_a, text_b))
+    # 128 permutations give a standard error of at most 0.5 / sqrt(128) ~ 0.044
+    assert abs(np.mean(errors)) < 0.02
+    assert np.max(np.abs(errors)) < 0.2
+
+
+def test_unrelated_texts_sharing_a_few_shingles_are_not_flagged():
+    rng = np.random.default_rng(1)
+    shared = "carbon capture and storage at coal power plants"
+    dedup = MinHashDeduplicator()
+    texts = [f"{shared} {random_text(rng)} {shared}" for _ in range(50)]
+    assert [dedup.add(str(i), text) for i, text in enumerate(texts)] == [None] * 50
+    assert dedup.stats.chunks_dropped == 0
+
+
+def test_small_hash_values_do_not_dominate_the_signature():
+    # two sets that share only their two smallest hashes; their Jaccard similarity is about 0.005
+    rng = np.random.default_rng(2)
+    dedup = MinHashDeduplicator()
+    a = np.unique(np.concatenate([[1, 2], rng.integers(1 << 20, 1 << 32, 200)])).astype(np.uint64)
+    b = np.unique(np.concatenate([[1, 2], rng.integers(1 << 20, 1 << 32, 200)])).astype(np.uint64)
+    assert dedup.similarity(dedup.signature_of(a), dedup.signature_of(b)) < 0.1
+
+
+def test_near_copies_are_flagged_and_counted():
+    rng = np.random.default_rng(3)
+    dedup = MinHashDeduplicator()
+    originals = [random_text(rng, 300) for _ in range(5)]
+    for i, text in enumerate(originals):
+        assert dedup.add(f"doc_{i}", text) is None
+    # one changed word near the end keeps the shingle Jaccard above 0.95
+    copies = [text.rsplit(" ", 3)[0] + " edited " + text.rsplit(" ", 2)[-1] for text in originals[:3]]
+    assert [dedup.add(f"copy_{i}", text) for i, text in enumerate(copies)] == ["doc_0", "doc_1", "doc_2"]
+    assert dedup.stats == DedupStats(
+        chunks_seen=8,
+        chunks_dropped=3,
+        chars_seen=sum(map(len, originals + copies)),
+        chars_dropped=sum(map(len, copies)),
+    )
+    assert dedup.stats.chunks_kept == 5
+
+
+@pytest.fixture
+def fake_collection(monkeypatch):
+    rng = np.random.default_rng(4)
+    originals = [random_text(rng, 200) for _ in range(6)]
+    # closest first, as chroma returns them: every other hit is a near copy of the one before it
+    documents = []
+    for text in originals:
+        documents += [text, text + " again"]
+    distances = [0.01 * i for i in range(len(documents))]
+    metadatas = [{"source": f"doc_{i}"} for i in range(len(documents))]
+    queries = []
+
+    def query(query_embeddings, n_results, include):
+        queries.append(n_results)
+        return {"documents": [documents[:n_results]], "metadatas": [metadatas[:n_results]], "distances": [distances[:n_results]]}
+
+    embedding = SimpleNamespace(data=[SimpleNamespace(embedding=[0.0])])
+    client = SimpleNamespace(embeddings=SimpleNamespace(create=lambda input, model: embedding))
+    monkeypatch.setattr(retriever, "get_openai_client", lambda: client)
+    monkeypatch.setattr(retriever, "get_collection", lambda: SimpleNamespace(query=query))
+    monkeypatch.setattr(retriever, "get_settings", lambda: SimpleNamespace(dedup_threshold=0.8))
+    return originals, queries
+
+
+def test_retrieve_keeps_the_closest_copy_of_each_duplicate_group(fake_collection):
+    originals, queries = fake_collection
+    results = retriever.retrieve("query", top_k=3)
+    assert queries == [3 * retriever.OVERFETCH_FACTOR]
+    assert [doc for doc, _, _ in results] == originals[:3]
+    assert [meta["source"] for _, meta, _ in results] == ["doc_0", "doc_2", "doc_4"]
+    assert [dist for _, _, dist in results] == pytest.approx([0.0, 0.02, 0.04])
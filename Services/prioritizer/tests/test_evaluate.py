@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from prioritizer.ml.evaluate import kendall_tau, main, ndcg_at_k, pairwise_accuracy, win_rate_relevance
+
+# one profile, three actions; the model orders them 0 > 1 > 2
+UTILITIES = np.array([[3.0, 2.0, 1.0]])
+# judgments: 0 beats 1, 2 beats 1, 0 beats 2
+PROFILE = np.array([0, 0, 0])
+ACTION_A = np.array([0, 1, 0])
+ACTION_B = np.array([1, 2, 2])
+LABELS = np.array([1.0, 0.0, 1.0])
+
+
+def test_pairwise_accuracy():
+    # the model gets (0, 1) and (0, 2) right and (1, 2) wrong
+    accuracy = pairwise_accuracy(UTILITIES, PROFILE, ACTION_A, ACTION_B, LABELS)
+    assert accuracy == pytest.approx([2 / 3])
+
+
+def test_win_rate_relevance():
+    relevance, seen = win_rate_relevance(1, 4, PROFILE, ACTION_A, ACTION_B, LABELS)
+    assert seen.tolist() == [[True, True, True, False]]
+    assert relevance[0, :3] == pytest.approx([1.0, 0.0, 0.5])
+    assert np.isnan(relevance[0, 3])
+
+
+def test_kendall_tau_hand_computed():
+    relevance = np.array([[1.0, 0.0, 0.5]])
+    seen = np.ones((1, 3), dtype=bool)
+    # pairs (0,1) and (0,2) concordant, (1,2) discordant
+    assert kendall_tau(UTILITIES, relevance, seen) == pytest.approx([1 / 3])
+
+
+def test_kendall_tau_is_not_derived_from_pairwise_accuracy():
+    # judged order matches the model exactly, though only two of three judged pairs were right
+    relevance = np.array([[1.0, 0.5, 0.0]])
+    seen = np.ones((1, 3), dtype=bool)
+    assert kendall_tau(UTILITIES, relevance, seen) == pytest.approx([1.0])
+
+
+def test_kendall_tau_ignores_unseen_actions_and_handles_ties():
+    utilities = np.array([[3.0, 2.0, 1.0, 100.0]])
+    relevance = np.array([[1.0, 1.0, 0.0, np.nan]])
+    seen = np.array([[True, True, True, False]])
+    # concordant (0,2) and (1,2); (0,1) is tied in the judged order
+    # tau-b = 2 / sqrt(3 untied model pairs * 2 untied judged pairs)
+    assert kendall_tau(utilities, relevance, seen) == pytest.approx([2 / np.sqrt(6)])
+
+
+def test_ndcg_at_k():
+    relevance = np.array([[1.0, 0.0, 0.5]])
+    seen = np.ones((1, 3), dtype=bool)
+    # model top 2 is [0, 1] with gains [1, 0]; the ideal top 2 has gains [1, 0.5]
+    expected = 1.0 / (1.0 + 0.5 / np.log2(3))
+    assert ndcg_at_k(UTILITIES, relevance, seen, k=2) == pytest.approx([expected])
+    assert ndcg_at_k(UTILITIES, np.array([[1.0, 0.5, 0.0]]), seen, k=3) == pytest.approx([1.0])
+
+
+def test_pairwise_accuracy_never_credits_ties():
+    utilities = np.array([[1.0, 1.0]])
+    pairs = dict(profile=np.array([0, 0]), action_a=np.array([0, 1]), action_b=np.array([1, 0]))
+    assert pairwise_accuracy(utilities, labels=np.array([1.0, 0.0]), **pairs) == pytest.approx([0.0])
+    assert pairwise_accuracy(utilities, labels=np.array([0.0, 1.0]), **pairs) == pytest.approx([0.0])
+
+
+@pytest.mark.parametrize("args", [["--folds", "1"], ["--folds", "0"], ["--k", "0"]])
+def test_main_rejects_degenerate_folds_and_k(args):
+    with pytest.raises(SystemExit) as exit_info:
+        main(args)
+    assert exit_info.value.code == 2
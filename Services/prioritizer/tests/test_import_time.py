@@ -0,0 +1,9 @@
+from prioritizer.scripts.check_import_time import IMPORT_BUDGET_MS, LAZY_PACKAGES, measure_import
+
+
+def test_main_imports_within_budget_without_heavy_packages():
+    elapsed_ms, imported = measure_import()
+
+    eager = sorted(name for name in imported if name.split(".")[0] in LAZY_PACKAGES)
+    assert eager == []
+    assert elapsed_ms < IMPORT_BUDGET_MS
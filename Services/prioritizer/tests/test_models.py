@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from prioritizer.catalog import load_catalog_bytes
+from prioritizer.models import construct_actions_json, load_action_pairs, load_actions_json, load_profiles_json
+
+ACTIONS = json.loads(load_catalog_bytes())
+PROFILES = [
+    {"city": "Lagos", "climate_zone": "tropical", "primary_transport": "motorcycle", "diet": "moderate_meat",
+     "housing_type": "house", "energy_source": "generator", "income_level": "low"},
+    {"city": "Oslo", "climate_zone": "cold", "primary_transport": "public_transit", "diet": "vegetarian",
+     "housing_type": "apartment", "energy_source": "grid", "income_level": "high"},
+]
+
+
+def pairs_json() -> bytes:
+    rows = []
+    for profile in PROFILES:
+        for a, b in [(0, 1), (1, 2), (0, 2)]:
+            # fresh dict copies, so sharing can only come from interning
+            rows.append({"action_a": dict(ACTIONS[a]), "action_b": dict(ACTIONS[b]), "user_profile": dict(profile), "score": 1})
+    return json.dumps(rows).encode()
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_load_action_pairs_interns_actions_and_profiles(trusted):
+    records = load_action_pairs(pairs_json(), trusted=trusted)
+
+    assert len(records) == 6
+    assert len({id(r.action_a) for r in records} | {id(r.action_b) for r in records}) == 3
+    assert len({id(r.user_profile) for r in records}) == 2
+    assert records[0].action_a is records[2].action_a is records[3].action_a
+    assert records[0].user_profile is records[1].user_profile
+    assert records[0].user_profile is not records[3].user_profile
+
+
+def test_trusted_catalog_matches_validated_catalog():
+    trusted = construct_actions_json(load_catalog_bytes())
+    validated = load_actions_json(load_catalog_bytes())
+
+    assert len(trusted) == len(validated) == len(ACTIONS)
+    assert [a.model_dump() for a in trusted] == [a.model_dump() for a in validated]
+
+
+def test_load_profiles_json_rejects_invalid_profiles():
+    assert len(load_profiles_json(json.dumps({"profiles": PROFILES}))) == 2
+
+    bad = [{**PROFILES[0], "climate_zone": "lunar"}]
+    with pytest.raises(ValidationError):
+        load_profiles_json(json.dumps({"profiles": bad}))
+    with pytest.raises(ValidationError):
+        load_profiles_json(json.dumps(PROFILES))
+
+
+def test_validated_path_parses_cost_strings():
+    rows = [{**ACTIONS[0], "cost": "1,000"}, {**ACTIONS[1], "cost": " "}]
+    actions = load_actions_json(json.dumps(rows))
+    assert actions[0].cost == 1000.0
+    assert actions[1].cost is None
+
+    pair = {"action_a": rows[0], "action_b": ACTIONS[1], "user_profile": PROFILES[0]}
+    assert load_action_pairs(json.dumps([pair]))[0].action_a.cost == 1000.0
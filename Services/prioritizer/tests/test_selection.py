@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from prioritizer.catalog import load_actions
+from prioritizer.ml.selection import (
+    InvalidCursor,
+    catalog_columns,
+    decode_cursor,
+    encode_cursor,
+    filter_mask,
+    select_page,
+    top_k,
+)
+
+COLUMNS = catalog_columns(load_actions())
+N_ACTIONS = len(COLUMNS.cost)
+
+
+def page_through(scores, candidates, k, diversify=False, diversity=0.3):
+    served, state = [], {}
+    while True:
+        page, state, exhausted = select_page(scores, candidates, COLUMNS, k, diversify, diversity, state)
+        served.extend(page.tolist())
+        if exhausted:
+            return served
+
+
+def test_top_k_breaks_ties_by_lower_index():
+    scores = np.array([1.0, 2.0, 2.0, 2.0, 0.0, 2.0])
+    assert top_k(scores, np.arange(6), 2).tolist() == [1, 2]
+    assert top_k(scores, np.arange(6), 5).tolist() == [1, 2, 3, 5, 0]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_paging_with_tied_scores_serves_every_candidate_once(seed):
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 4, size=N_ACTIONS).astype(np.float64)
+    candidates = np.flatnonzero(rng.random(N_ACTIONS) < 0.8)
+    k = int(rng.integers(1, 10))
+
+    served = page_through(scores, candidates, k)
+
+    assert sorted(served) == candidates.tolist()
+    expected = sorted(candidates.tolist(), key=lambda i: (-scores[i], i))
+    assert served == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_diversified_pages_match_a_single_pass(seed):
+    scores = np.random.default_rng(seed).normal(size=N_ACTIONS)
+    candidates = np.arange(N_ACTIONS)
+
+    single, _, _ = select_page(scores, candidates, COLUMNS, 21, True, 0.3, {})
+    paged = page_through(scores, candidates, 7, diversify=True)
+
+    assert paged[:21] == single.tolist()
+    assert sorted(paged) == candidates.tolist()
+
+
+def test_diversified_pages_match_a_single_pass_with_filters():
+    scores = np.random.default_rng(0).normal(size=N_ACTIONS)
+    candidates = np.flatnonzero(filter_mask(COLUMNS, max_cost=100))
+
+    single, _, _ = select_page(scores, candidates, COLUMNS, len(candidates), True, 0.5, {})
+    assert page_through(scores, candidates, 3, diversify=True, diversity=0.5) == single.tolist()
+
+
+def cursor(**state):
+    return encode_cursor({"model_version": "v1", "query": "q", **state})
+
+
+@pytest.mark.parametrize(
+    "bad_cursor, diversify",
+    [
+        ("not base64 json!", False),
+        (encode_cursor([1, 2]), False),
+        (cursor(index=0), False),
+        (cursor(score="high", index=0), False),
+        (cursor(score=True, index=0), False),
+        (cursor(score=1.0, index=N_ACTIONS), False),
+        (cursor(score=1.0, index="3"), False),
+        (cursor(score=1.0), False),
+        (cursor(served=[0, N_ACTIONS]), True),
+        (cursor(served=[-1]), True),
+        (cursor(served=[1, 1]), True),
+        (cursor(served="0,1"), True),
+        (cursor(score=1.0, index=0), True),
+        (encode_cursor({"query": "q", "score": 1.0, "index": 0}), False),
+    ],
+)
+def test_decode_cursor_rejects_malformed_state(bad_cursor, diversify):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(bad_cursor, N_ACTIONS, diversify)
+
+
+def test_decode_cursor_accepts_cursors_from_select_page():
+    scores = np.random.default_rng(0).normal(size=N_ACTIONS)
+    for diversify in (False, True):
+        _, state, _ = select_page(scores, np.arange(N_ACTIONS), COLUMNS, 5, diversify, 0.3, {})
+        assert decode_cursor(cursor(**state), N_ACTIONS, diversify)["model_version"] == "v1"
@@ -0,0 +1,65 @@
+import numpy as np
+
+from prioritizer.catalog import catalog_hash, load_actions
+from prioritizer.ml.artifacts import publish_ranker
+from prioritizer.ml.ranker import FEATURE_SCHEMA, Ranker, feature_matrix
+from prioritizer.ml.registry import ModelRegistry
+from prioritizer.models import UserProfile
+
+PROFILE = UserProfile(
+    city="Lagos",
+    climate_zone="tropical",
+    primary_transport="motorcycle",
+    diet="moderate_meat",
+    housing_type="house",
+    energy_source="generator",
+    income_level="low",
+)
+
+
+def make_ranker(seed: int) -> Ranker:
+    return Ranker(weights=np.random.default_rng(seed).normal(size=len(FEATURE_SCHEMA)), scale=np.ones(len(FEATURE_SCHEMA)))
+
+
+def test_worker_attaches_snapshot_written_by_master(tmp_path):
+    model_dir, snapshot_dir = tmp_path / "model", tmp_path / "snapshot"
+    ranker = make_ranker(0)
+    version = publish_ranker(ranker, catalog_hash(), model_dir)
+
+    master = ModelRegistry(model_dir, snapshot_dir=snapshot_dir)
+    master.load(load_actions(), catalog_hash())
+    worker = ModelRegistry(model_dir, snapshot_dir=snapshot_dir)
+    worker.load(load_actions(), catalog_hash())
+
+    assert isinstance(worker.active.ranking_table, np.memmap)
+    assert not worker.active.ranking_table.flags.writeable
+    expected = ranker.utilities(feature_matrix(load_actions(), PROFILE))
+    np.testing.assert_allclose(worker.active.score(PROFILE), expected)
+    assert sorted(p.name for p in (snapshot_dir / version).iterdir()) == [
+        "manifest.json", "ranking_table.npy", "scale.npy", "weights.npy",
+    ]
+
+
+def test_hot_reload_prunes_older_snapshots(tmp_path):
+    model_dir, snapshot_dir = tmp_path / "model", tmp_path / "snapshot"
+    registry = ModelRegistry(model_dir, snapshot_dir=snapshot_dir)
+    old_version = publish_ranker(make_ranker(0), catalog_hash(), model_dir)
+    registry.load(load_actions(), catalog_hash())
+
+    new_version = publish_ranker(make_ranker(1), catalog_hash(), model_dir)
+    assert registry.reload_if_changed()
+
+    assert registry.active.version == new_version
+    assert [p.name for p in snapshot_dir.iterdir()] == [new_version]
+    assert old_version != new_version
+
+
+def test_catalog_columns_are_built_before_the_swap(tmp_path):
+    model_dir = tmp_path / "model"
+    publish_ranker(make_ranker(0), catalog_hash(), model_dir)
+    registry = ModelRegistry(model_dir, snapshot_dir=tmp_path / "snapshot")
+    registry.load(load_actions(), catalog_hash())
+
+    # a plain field of the frozen LoadedModel, not computed lazily on the request path
+    assert "columns" in registry.active.__dataclass_fields__
+    assert len(registry.active.columns.cost) == len(load_actions())